@@ -1,19 +1,21 @@
 use anyhow::Result;
 use chrono::NaiveDate;
+use std::collections::HashMap;
 use std::hash::{Hash, Hasher};
-use std::path::PathBuf;
+use std::path::{Path, PathBuf};
+use std::sync::{Mutex, OnceLock};
+use std::time::SystemTime;
 use tracing::{debug, info, warn};
 
 use crate::parser;
 use crate::types::HomeworkEntry;
 
-/// Keywords that indicate a test/quiz (case-insensitive)
-const TEST_KEYWORDS: &[&str] = &["verifica", "prova", "test", "interrogazione"];
-
 /// Check if an entry is a test or quiz based on keywords in the task
 pub fn is_test_or_quiz(entry: &HomeworkEntry) -> bool {
     let task_lower = entry.task.to_lowercase();
-    TEST_KEYWORDS.iter().any(|kw| task_lower.contains(kw))
+    parser::TEST_KEYWORDS
+        .iter()
+        .any(|kw| task_lower.contains(kw))
 }
 
 /// Generate study sessions for a test entry.
@@ -174,6 +176,54 @@ fn compute_work_reminder_id(parent_id: &str) -> String {
     format!("lavoro_{:016x}", hasher.finish())
 }
 
+/// Cached parse result for one export file, keyed by the file's canonical
+/// path and invalidated when its modification time or size changes.
+struct CachedParse {
+    mtime: SystemTime,
+    size: u64,
+    entries: Vec<HomeworkEntry>,
+}
+
+/// In-process parse cache. Export files are immutable once downloaded, so
+/// refreshes (one per page load while the server runs) would otherwise
+/// re-parse the same files over and over.
+static PARSE_CACHE: OnceLock<Mutex<HashMap<PathBuf, CachedParse>>> = OnceLock::new();
+
+/// Parse a single export file, reusing the cached result when the file's
+/// mtime and size are unchanged. Parse failures are not cached.
+fn parse_export_cached(file: &Path) -> Result<Vec<HomeworkEntry>> {
+    let stamp = std::fs::metadata(file)
+        .ok()
+        .and_then(|m| Some((m.modified().ok()?, m.len())));
+    let key = file.canonicalize().ok();
+
+    if let (Some((mtime, size)), Some(key)) = (&stamp, &key) {
+        let cache = PARSE_CACHE.get_or_init(Default::default).lock().unwrap();
+        if let Some(cached) = cache.get(key) {
+            if cached.mtime == *mtime && cached.size == *size {
+                debug!(file = %file.display(), "Using cached parse result");
+                return Ok(cached.entries.clone());
+            }
+        }
+    }
+
+    let parsed = parser::parse_excel_xml(file)?;
+
+    if let (Some((mtime, size)), Some(key)) = (stamp, key) {
+        let mut cache = PARSE_CACHE.get_or_init(Default::default).lock().unwrap();
+        cache.insert(
+            key,
+            CachedParse {
+                mtime,
+                size,
+                entries: parsed.clone(),
+            },
+        );
+    }
+
+    Ok(parsed)
+}
+
 /// Parse all export files and return the entries.
 ///
 /// This function only parses files - deduplication is handled by the database
@@ -188,7 +238,7 @@ pub fn parse_all_exports() -> Result<Vec<HomeworkEntry>> {
     let mut entries: Vec<HomeworkEntry> = Vec::new();
     for file in &files {
         debug!(file = %file.display(), "Processing export file");
-        match parser::parse_excel_xml(file) {
+        match parse_export_cached(file) {
             Ok(parsed) => {
                 debug!(count = parsed.len(), "Found entries");
                 entries.extend(parsed);
@@ -216,12 +266,13 @@ fn find_all_exports() -> Result<Vec<PathBuf>> {
         return Ok(Vec::new());
     }
 
+    // Filter on the entry's file name directly; building a PathBuf per
+    // entry just to read its name back allocates twice for non-matches.
     let mut files: Vec<_> = std::fs::read_dir(&data_dir)?
         .filter_map(|e| e.ok())
         .filter(|e| {
-            e.path()
-                .file_name()
-                .and_then(|n| n.to_str())
+            e.file_name()
+                .to_str()
                 .map(|n| n.starts_with("export_") && n.contains(".xls"))
                 .unwrap_or(false)
         })
@@ -393,6 +444,40 @@ mod tests {
         assert_eq!(entries.len(), 2);
     }
 
+    #[test]
+    fn test_parse_export_cached_reuses_unchanged_file() {
+        let temp_dir = TempDir::new().unwrap();
+        let file = temp_dir.path().join("export_20250115.xls");
+        create_test_excel_xml(&file, &[("compiti", "2025-01-15", "Matematica", "Task 1")]);
+
+        let first = parse_export_cached(&file).unwrap();
+        let second = parse_export_cached(&file).unwrap();
+
+        assert_eq!(first.len(), 1);
+        assert_eq!(first.len(), second.len());
+        assert_eq!(first[0].task, second[0].task);
+    }
+
+    #[test]
+    fn test_parse_export_cached_reparses_changed_file() {
+        let temp_dir = TempDir::new().unwrap();
+        let file = temp_dir.path().join("export_20250115.xls");
+        create_test_excel_xml(&file, &[("compiti", "2025-01-15", "Matematica", "Task 1")]);
+
+        assert_eq!(parse_export_cached(&file).unwrap().len(), 1);
+
+        // Rewrite with different content (and size) - must be re-parsed
+        create_test_excel_xml(
+            &file,
+            &[
+                ("compiti", "2025-01-15", "Matematica", "Task 1"),
+                ("nota", "2025-01-16", "Italiano", "Task 2"),
+            ],
+        );
+
+        assert_eq!(parse_export_cached(&file).unwrap().len(), 2);
+    }
+
     // ========== is_test_or_quiz tests ==========
 
     #[test]
@@ -75,9 +75,10 @@ pub fn month_name(month: u32) -> &'static str {
 
 /// Serialize entries grouped by date into a JSON string for the JS calendar renderer.
 pub fn entries_to_json(by_date: &BTreeMap<&str, Vec<&HomeworkEntry>>) -> String {
-    use std::collections::HashMap;
-
-    let map: HashMap<&str, Vec<_>> = by_date
+    // Serialize the BTreeMap directly - serde treats it as a JSON object,
+    // so there is no need to rehash everything into an intermediate map
+    // (and the output gains stable, date-sorted keys).
+    let map: BTreeMap<&str, Vec<_>> = by_date
         .iter()
         .map(|(date, items)| {
             let entries: Vec<_> = items
@@ -42,6 +42,14 @@ pub fn render_page(entries: &[HomeworkEntry]) -> Markup {
     let entry_by_id: std::collections::HashMap<&str, &HomeworkEntry> =
         entries.iter().map(|e| (e.id.as_str(), e)).collect();
 
+    // And the reverse: parent compiti id -> its lavoro child, built once so
+    // each compiti row is a map lookup instead of a scan over all entries
+    let lavoro_by_parent: std::collections::HashMap<&str, &HomeworkEntry> = entries
+        .iter()
+        .filter(|e| e.entry_type == "lavoro")
+        .filter_map(|e| e.parent_id.as_deref().map(|pid| (pid, e)))
+        .collect();
+
     let total_count = entries.len();
     let completed_count = entries.iter().filter(|e| e.completed).count();
 
@@ -79,7 +87,7 @@ pub fn render_page(entries: &[HomeworkEntry]) -> Markup {
                             }
                         } @else {
                             @for (date, items) in by_date.iter().rev() {
-                                (render_date_group(date, items, &entry_by_id))
+                                (render_date_group(date, items, &entry_by_id, &lavoro_by_parent))
                             }
                         }
                     }
@@ -176,6 +184,7 @@ fn render_date_group(
     date: &str,
     items: &[&HomeworkEntry],
     entry_by_id: &std::collections::HashMap<&str, &HomeworkEntry>,
+    lavoro_by_parent: &std::collections::HashMap<&str, &HomeworkEntry>,
 ) -> Markup {
     let all_completed = items.iter().all(|item| item.completed);
     let group_class = if all_completed {
@@ -208,12 +217,9 @@ fn render_date_group(
                     } else {
                         None
                     };
-                    // For compiti: find the lavoro child so we can sync completion
+                    // For compiti: look up the lavoro child so we can sync completion
                     @let lavoro_child_id = if is_compiti {
-                        entry_by_id.values()
-                            .find(|e| e.entry_type == "lavoro"
-                                && e.parent_id.as_deref() == Some(entry_id.as_str()))
-                            .map(|e| e.id.clone())
+                        lavoro_by_parent.get(entry_id.as_str()).map(|e| e.id.clone())
                     } else {
                         None
                     };
@@ -453,7 +459,13 @@ mod tests {
             make_entry("nota", "2025-01-15", "Italiano", "Task 2"),
         ];
         let refs: Vec<&HomeworkEntry> = entries.iter().collect();
-        let html = render_date_group("2025-01-15", &refs, &Default::default()).into_string();
+        let html = render_date_group(
+            "2025-01-15",
+            &refs,
+            &Default::default(),
+            &Default::default(),
+        )
+        .into_string();
         assert!(html.contains("date-group"));
         assert!(html.contains("2025-01-15"));
         assert!(html.contains("Matematica"));
@@ -467,7 +479,13 @@ mod tests {
             make_entry("nota", "2025-01-15", "Italiano", "Task 2"),
         ];
         let refs: Vec<&HomeworkEntry> = entries.iter().collect();
-        let html = render_date_group("2025-01-15", &refs, &Default::default()).into_string();
+        let html = render_date_group(
+            "2025-01-15",
+            &refs,
+            &Default::default(),
+            &Default::default(),
+        )
+        .into_string();
         let entry1_id = entries[0].stable_id();
         let entry2_id = entries[1].stable_id();
         assert!(html.contains(&format!("entry-{}", entry1_id)));
@@ -481,9 +499,21 @@ mod tests {
         let entry1 = make_entry("compiti", "2025-01-15", "Matematica", "Task 1");
         let entry2 = make_entry("nota", "2025-01-16", "Italiano", "Task 2");
         let refs1: Vec<&HomeworkEntry> = vec![&entry1, &entry2];
-        let html1 = render_date_group("2025-01-15", &refs1, &Default::default()).into_string();
+        let html1 = render_date_group(
+            "2025-01-15",
+            &refs1,
+            &Default::default(),
+            &Default::default(),
+        )
+        .into_string();
         let refs2: Vec<&HomeworkEntry> = vec![&entry2, &entry1];
-        let html2 = render_date_group("2025-01-15", &refs2, &Default::default()).into_string();
+        let html2 = render_date_group(
+            "2025-01-15",
+            &refs2,
+            &Default::default(),
+            &Default::default(),
+        )
+        .into_string();
         let entry1_id = entry1.stable_id();
         assert!(html1.contains(&format!("entry-{}", entry1_id)));
         assert!(html2.contains(&format!("entry-{}", entry1_id)));
@@ -623,7 +653,13 @@ mod tests {
     fn test_render_date_group_has_delete_buttons() {
         let entries = [make_entry("compiti", "2025-01-15", "Matematica", "Task 1")];
         let refs: Vec<&HomeworkEntry> = entries.iter().collect();
-        let html = render_date_group("2025-01-15", &refs, &Default::default()).into_string();
+        let html = render_date_group(
+            "2025-01-15",
+            &refs,
+            &Default::default(),
+            &Default::default(),
+        )
+        .into_string();
         assert!(html.contains("delete-btn"));
         assert!(html.contains(r#"title="Delete entry""#));
     }
@@ -632,7 +668,13 @@ mod tests {
     fn test_render_date_group_draggable() {
         let entries = [make_entry("compiti", "2025-01-15", "Matematica", "Task 1")];
         let refs: Vec<&HomeworkEntry> = entries.iter().collect();
-        let html = render_date_group("2025-01-15", &refs, &Default::default()).into_string();
+        let html = render_date_group(
+            "2025-01-15",
+            &refs,
+            &Default::default(),
+            &Default::default(),
+        )
+        .into_string();
         assert!(html.contains(r#"draggable="true""#));
     }
 
@@ -640,7 +682,13 @@ mod tests {
     fn test_render_date_group_data_date() {
         let entries = [make_entry("compiti", "2025-01-15", "Matematica", "Task 1")];
         let refs: Vec<&HomeworkEntry> = entries.iter().collect();
-        let html = render_date_group("2025-01-15", &refs, &Default::default()).into_string();
+        let html = render_date_group(
+            "2025-01-15",
+            &refs,
+            &Default::default(),
+            &Default::default(),
+        )
+        .into_string();
         assert!(html.contains(r#"data-date="2025-01-15""#));
     }
 
@@ -649,7 +697,13 @@ mod tests {
         let mut entry = make_entry("studio", "2025-01-15", "Matematica", "Study for: Test");
         entry.parent_id = Some("parent123".to_string());
         let refs: Vec<&HomeworkEntry> = vec![&entry];
-        let html = render_date_group("2025-01-15", &refs, &Default::default()).into_string();
+        let html = render_date_group(
+            "2025-01-15",
+            &refs,
+            &Default::default(),
+            &Default::default(),
+        )
+        .into_string();
         assert!(html.contains(r#"data-generated="true""#));
         assert!(html.contains("auto-badge"));
         assert!(html.contains("auto"));
@@ -659,7 +713,13 @@ mod tests {
     fn test_render_date_group_orphaned_entry() {
         let entry = make_entry("studio", "2025-01-15", "Matematica", "Study for: Test");
         let refs: Vec<&HomeworkEntry> = vec![&entry];
-        let html = render_date_group("2025-01-15", &refs, &Default::default()).into_string();
+        let html = render_date_group(
+            "2025-01-15",
+            &refs,
+            &Default::default(),
+            &Default::default(),
+        )
+        .into_string();
         assert!(html.contains(r#"data-orphaned="true""#));
         assert!(html.contains("orphan-badge"));
         assert!(html.contains("orphaned"));
@@ -670,7 +730,13 @@ mod tests {
         let mut entry = make_entry("compiti", "2025-01-15", "Matematica", "Task 1");
         entry.completed = true;
         let refs: Vec<&HomeworkEntry> = vec![&entry];
-        let html = render_date_group("2025-01-15", &refs, &Default::default()).into_string();
+        let html = render_date_group(
+            "2025-01-15",
+            &refs,
+            &Default::default(),
+            &Default::default(),
+        )
+        .into_string();
         assert!(html.contains("homework-item") && html.contains("completed"));
         assert!(html.contains("checked"));
     }
@@ -1,16 +1,18 @@
 use anyhow::{Context, Result};
 use calamine::{open_workbook_auto, Data, Reader};
 use quick_xml::escape::unescape;
-use quick_xml::events::Event;
+use quick_xml::events::{BytesStart, Event};
 use quick_xml::reader::Reader as XmlReader;
 use std::collections::HashMap;
 use std::fs;
+use std::io::{BufRead, BufReader};
 use std::path::Path;
 
 use crate::types::HomeworkEntry;
 
-/// Keywords that indicate a test/exam entry (case-insensitive)
-const TEST_KEYWORDS: &[&str] = &["verifica", "prova", "test", "interrogazione"];
+/// Keywords that indicate a test/exam entry (case-insensitive).
+/// Shared with `data::is_test_or_quiz` so both classifiers agree.
+pub(crate) const TEST_KEYWORDS: &[&str] = &["verifica", "prova", "test", "interrogazione"];
 
 /// Check if task text contains test keywords, returning "verifica" if so
 fn detect_entry_type(task: &str, original_type: &str) -> String {
@@ -27,42 +29,36 @@ fn detect_entry_type(task: &str, original_type: &str) -> String {
 /// Parse an Excel file and extract homework entries.
 /// Supports SpreadsheetML XML format (.xls with XML content) and modern Excel formats (.xlsx, .xlsb, .ods)
 pub fn parse_excel_xml(path: &Path) -> Result<Vec<HomeworkEntry>> {
-    // First try to read the file to check if it's SpreadsheetML XML
-    let content = fs::read_to_string(path).context("Failed to read file")?;
+    let file = fs::File::open(path).context("Failed to read file")?;
+    let mut reader = BufReader::new(file);
 
-    // Check if it's SpreadsheetML XML format
-    if content.starts_with("<?xml") || content.contains("<Workbook") {
-        return parse_spreadsheet_ml(&content);
+    // Dispatch on the file's magic bytes; fill_buf does not consume, so a
+    // subsequent XML parse still starts from the first byte. ZIP (xlsx/ods)
+    // and OLE2 (legacy binary xls) containers go straight to calamine —
+    // sniffing them as text would misroute them.
+    let prefix = reader.fill_buf().context("Failed to read file")?;
+    if prefix.starts_with(b"PK\x03\x04") || prefix.starts_with(&[0xd0, 0xcf, 0x11, 0xe0]) {
+        return parse_with_calamine(path);
     }
 
-    // Otherwise try calamine for modern Excel formats
+    // SpreadsheetML XML starts with markup (possibly after a BOM/whitespace)
+    let head = String::from_utf8_lossy(&prefix[..prefix.len().min(1024)]);
+    if head
+        .trim_start_matches('\u{feff}')
+        .trim_start()
+        .starts_with('<')
+    {
+        return parse_spreadsheet_ml(reader);
+    }
+
+    // Unknown signature - let calamine take a shot before giving up
     parse_with_calamine(path)
 }
 
 /// Parse SpreadsheetML XML format (used by older Excel exports)
-fn parse_spreadsheet_ml(content: &str) -> Result<Vec<HomeworkEntry>> {
-    let rows = parse_spreadsheet_rows(content)?;
-
-    if rows.is_empty() {
-        anyhow::bail!("No data rows found in file");
-    }
-
-    // First row is headers
-    let headers = &rows[0];
-
-    // Map column indices
-    let col_indices = map_columns(headers);
-
-    // Parse data rows into entries
-    let mut entries = Vec::new();
-
-    for row in rows.iter().skip(1) {
-        if let Some(entry) = parse_row(row, &col_indices) {
-            entries.push(entry);
-        }
-    }
-
-    Ok(entries)
+fn parse_spreadsheet_ml(reader: impl BufRead) -> Result<Vec<HomeworkEntry>> {
+    let rows = parse_spreadsheet_rows(reader)?;
+    entries_from_rows(&rows)
 }
 
 /// Parse with calamine for modern Excel formats
@@ -82,25 +78,48 @@ fn parse_with_calamine(path: &Path) -> Result<Vec<HomeworkEntry>> {
         .worksheet_range(&sheet_name)
         .context("Failed to read worksheet")?;
 
-    // Convert to rows of strings
-    let rows: Vec<Vec<String>> = range
-        .rows()
-        .map(|row| row.iter().map(cell_to_string).collect())
-        .collect();
+    // Convert the header row first so we know which columns matter; data
+    // rows then only pay the cell-to-string conversion for those columns
+    // (ClasseViva exports carry plenty we never look at).
+    let mut row_iter = range.rows();
+    let headers: Vec<String> = match row_iter.next() {
+        Some(row) => row.iter().map(cell_to_string).collect(),
+        None => anyhow::bail!("No data rows found in file"),
+    };
+    let wanted: Vec<usize> = map_columns(&headers).into_values().collect();
+
+    let mut rows: Vec<Vec<String>> = Vec::with_capacity(range.height());
+    rows.push(headers);
+    for row in row_iter {
+        rows.push(
+            row.iter()
+                .enumerate()
+                .map(|(i, cell)| {
+                    if wanted.contains(&i) {
+                        cell_to_string(cell)
+                    } else {
+                        String::new()
+                    }
+                })
+                .collect(),
+        );
+    }
+
+    entries_from_rows(&rows)
+}
 
+/// Turn raw rows of cell strings into homework entries.
+///
+/// Shared tail of both parse paths: the first row names the columns,
+/// every following row is a candidate entry.
+fn entries_from_rows(rows: &[Vec<String>]) -> Result<Vec<HomeworkEntry>> {
     if rows.is_empty() {
         anyhow::bail!("No data rows found in file");
     }
 
-    // First row is headers
-    let headers = &rows[0];
-
-    // Map column indices
-    let col_indices = map_columns(headers);
+    let col_indices = map_columns(&rows[0]);
 
-    // Parse data rows into entries
     let mut entries = Vec::new();
-
     for row in rows.iter().skip(1) {
         if let Some(entry) = parse_row(row, &col_indices) {
             entries.push(entry);
@@ -110,9 +129,9 @@ fn parse_with_calamine(path: &Path) -> Result<Vec<HomeworkEntry>> {
     Ok(entries)
 }
 
-/// Parse SpreadsheetML XML into rows of cell values
-fn parse_spreadsheet_rows(xml: &str) -> Result<Vec<Vec<String>>> {
-    let mut reader = XmlReader::from_str(xml);
+/// Parse SpreadsheetML XML into rows of cell values, streaming from the reader
+fn parse_spreadsheet_rows(xml: impl BufRead) -> Result<Vec<Vec<String>>> {
+    let mut reader = XmlReader::from_reader(xml);
     // Don't trim text - we'll trim at cell level to preserve spaces around entities
     reader.config_mut().trim_text(false);
 
@@ -121,10 +140,12 @@ fn parse_spreadsheet_rows(xml: &str) -> Result<Vec<Vec<String>>> {
     let mut in_row = false;
     let mut in_cell = false;
     let mut in_data = false;
+    let mut cell_had_data = false;
     let mut current_text = String::new();
+    let mut buf = Vec::new();
 
     loop {
-        match reader.read_event() {
+        match reader.read_event_into(&mut buf) {
             Ok(Event::Start(e)) => {
                 let local_name = e.local_name();
                 match local_name.as_ref() {
@@ -135,6 +156,15 @@ fn parse_spreadsheet_rows(xml: &str) -> Result<Vec<Vec<String>>> {
                     b"Cell" => {
                         if in_row {
                             in_cell = true;
+                            cell_had_data = false;
+                            // SpreadsheetML omits empty cells and re-anchors
+                            // the next one with ss:Index (1-based). Pad the
+                            // row so later cells keep their column position.
+                            if let Some(idx) = cell_index(&e) {
+                                while current_row.len() + 1 < idx {
+                                    current_row.push(String::new());
+                                }
+                            }
                         }
                     }
                     b"Data" => {
@@ -156,8 +186,8 @@ fn parse_spreadsheet_rows(xml: &str) -> Result<Vec<Vec<String>>> {
                         in_row = false;
                     }
                     b"Cell" => {
-                        if in_cell && !in_data {
-                            // Empty cell
+                        if in_cell && !cell_had_data {
+                            // Empty cell - keep its column slot
                             current_row.push(String::new());
                         }
                         in_cell = false;
@@ -166,6 +196,7 @@ fn parse_spreadsheet_rows(xml: &str) -> Result<Vec<Vec<String>>> {
                         if in_data {
                             current_row.push(current_text.trim().to_string());
                             current_text.clear();
+                            cell_had_data = true;
                         }
                         in_data = false;
                     }
@@ -202,11 +233,23 @@ fn parse_spreadsheet_rows(xml: &str) -> Result<Vec<Vec<String>>> {
             Err(e) => anyhow::bail!("XML parse error: {}", e),
             _ => {}
         }
+        buf.clear();
     }
 
     Ok(rows)
 }
 
+/// Read the 1-based `ss:Index` attribute from a Cell start tag, if present
+fn cell_index(cell: &BytesStart) -> Option<usize> {
+    cell.attributes().flatten().find_map(|attr| {
+        if attr.key.local_name().as_ref() == b"Index" {
+            std::str::from_utf8(&attr.value).ok()?.trim().parse().ok()
+        } else {
+            None
+        }
+    })
+}
+
 /// Convert a calamine Data cell to a String
 fn cell_to_string(cell: &Data) -> String {
     match cell {
@@ -240,6 +283,14 @@ fn cell_to_string(cell: &Data) -> String {
     }
 }
 
+/// Header keywords identifying each logical column, matched
+/// case-insensitively against the sheet's header row
+const COLUMN_KEYWORDS: &[(&str, &[&str])] = &[
+    ("date", &["data", "inizio", "date"]),
+    ("subject", &["materia", "subject", "corso"]),
+    ("task", &["nota", "descrizione", "task", "compito"]),
+];
+
 /// Map header names to column indices
 fn map_columns(headers: &[String]) -> HashMap<&'static str, usize> {
     let mut indices = HashMap::new();
@@ -247,23 +298,10 @@ fn map_columns(headers: &[String]) -> HashMap<&'static str, usize> {
     for (i, header) in headers.iter().enumerate() {
         let lower = header.to_lowercase();
 
-        // Date column
-        if lower.contains("data") || lower.contains("inizio") || lower.contains("date") {
-            indices.entry("date").or_insert(i);
-        }
-
-        // Subject column
-        if lower.contains("materia") || lower.contains("subject") || lower.contains("corso") {
-            indices.entry("subject").or_insert(i);
-        }
-
-        // Task/description column
-        if lower.contains("nota")
-            || lower.contains("descrizione")
-            || lower.contains("task")
-            || lower.contains("compito")
-        {
-            indices.entry("task").or_insert(i);
+        for (key, keywords) in COLUMN_KEYWORDS {
+            if keywords.iter().any(|kw| lower.contains(kw)) {
+                indices.entry(*key).or_insert(i);
+            }
         }
 
         // Type column (but not "tipo evento")
@@ -277,17 +315,18 @@ fn map_columns(headers: &[String]) -> HashMap<&'static str, usize> {
 
 /// Parse a single row into a HomeworkEntry
 fn parse_row(row: &[String], col_indices: &HashMap<&'static str, usize>) -> Option<HomeworkEntry> {
-    let get_col = |key: &str| -> String {
+    // Borrow the trimmed cell text; nothing is allocated for rows that get
+    // filtered out below
+    let get_col = |key: &str| -> &str {
         col_indices
             .get(key)
             .and_then(|&i| row.get(i))
-            .map(|s| s.trim().to_string())
-            .unwrap_or_default()
+            .map(|s| s.trim())
+            .unwrap_or("")
     };
 
     let raw_type = get_col("type");
-    let date = normalize_date(&get_col("date"));
-    let mut subject = get_col("subject");
+    let subject = get_col("subject");
     let task = get_col("task");
 
     // Only include entries with meaningful data
@@ -295,20 +334,26 @@ fn parse_row(row: &[String], col_indices: &HashMap<&'static str, usize>) -> Opti
         return None;
     }
 
+    let date = normalize_date(get_col("date"));
+
     // Detect entry type based on task content (e.g., verifica, prova, test)
-    let entry_type = detect_entry_type(&task, &raw_type);
+    let entry_type = detect_entry_type(task, raw_type);
 
-    // If subject is empty, try to extract it from the task text
-    if subject.is_empty() {
-        if let Some(extracted) = extract_subject_from_task(&task) {
-            subject = extracted;
-        }
+    // If subject is empty, try to extract it from the task text; otherwise
+    // normalize it (title case + overrides like "Seconda Lingua Comunitaria"
+    // -> "Tedesco")
+    let subject = if subject.is_empty() {
+        extract_subject_from_task(task).unwrap_or_default()
     } else {
-        // Normalize subject (title case + overrides like "Seconda Lingua Comunitaria" -> "Tedesco")
-        subject = normalize_subject(&subject);
-    }
+        normalize_subject(subject)
+    };
 
-    Some(HomeworkEntry::new(entry_type, date, subject, task))
+    Some(HomeworkEntry::new(
+        entry_type,
+        date,
+        subject,
+        task.to_string(),
+    ))
 }
 
 /// Subject name overrides - maps variations to canonical names
@@ -729,11 +774,9 @@ mod tests {
 </Worksheet>
 </Workbook>"#;
 
-        let rows = parse_spreadsheet_rows(xml).unwrap();
+        let rows = parse_spreadsheet_rows(xml.as_bytes()).unwrap();
 
         assert_eq!(rows.len(), 2);
-        // Parser adds empty string for Cell end when no Data was inside
-        // The actual values are at positions 0 and 2 (with empty strings between)
         assert!(rows[0].contains(&"A1".to_string()));
         assert!(rows[0].contains(&"B1".to_string()));
         assert!(rows[1].contains(&"A2".to_string()));
@@ -753,7 +796,7 @@ mod tests {
 </Worksheet>
 </Workbook>"#;
 
-        let rows = parse_spreadsheet_rows(xml).unwrap();
+        let rows = parse_spreadsheet_rows(xml.as_bytes()).unwrap();
 
         assert_eq!(rows[0][0], "trimmed");
     }
@@ -768,10 +811,60 @@ mod tests {
 </Worksheet>
 </Workbook>"#;
 
-        let rows = parse_spreadsheet_rows(xml).unwrap();
+        let rows = parse_spreadsheet_rows(xml.as_bytes()).unwrap();
         assert!(rows.is_empty());
     }
 
+    #[test]
+    fn test_parse_spreadsheet_rows_honors_cell_index() {
+        // SpreadsheetML omits empty cells and re-anchors with ss:Index (1-based)
+        let xml = r#"<?xml version="1.0"?>
+<Workbook xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet">
+<Worksheet>
+<Table>
+<Row>
+<Cell><Data>A1</Data></Cell>
+<Cell ss:Index="4"><Data>D1</Data></Cell>
+</Row>
+</Table>
+</Worksheet>
+</Workbook>"#;
+
+        let rows = parse_spreadsheet_rows(xml.as_bytes()).unwrap();
+
+        assert_eq!(rows.len(), 1);
+        assert_eq!(rows[0], vec!["A1", "", "", "D1"]);
+    }
+
+    #[test]
+    fn test_parse_excel_xml_sparse_row_keeps_column_alignment() {
+        // The Materia cell is skipped and Nota re-anchored via ss:Index, so
+        // the task must still land under the right header
+        let xml = r#"<?xml version="1.0"?>
+<Workbook xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet">
+<Worksheet>
+<Table>
+<Row>
+<Cell><Data>Data Inizio</Data></Cell>
+<Cell><Data>Materia</Data></Cell>
+<Cell><Data>Nota</Data></Cell>
+</Row>
+<Row>
+<Cell><Data>2025-01-15</Data></Cell>
+<Cell ss:Index="3"><Data>Esercizi pagina 42</Data></Cell>
+</Row>
+</Table>
+</Worksheet>
+</Workbook>"#;
+
+        let file = create_test_xml_file(xml);
+        let entries = parse_excel_xml(file.path()).unwrap();
+
+        assert_eq!(entries.len(), 1);
+        assert_eq!(entries[0].date, "2025-01-15");
+        assert_eq!(entries[0].task, "Esercizi pagina 42");
+    }
+
     // ========== cell_to_string tests ==========
 
     #[test]
@@ -1,7 +1,7 @@
 //! Playwright browser setup and management.
 
 use anyhow::{Context, Result};
-use playwright::api::{Browser, BrowserContext, Playwright};
+use playwright::api::{BrowserContext, Playwright};
 use std::path::PathBuf;
 use std::sync::Arc;
 
@@ -10,13 +10,28 @@ use std::sync::Arc;
 pub struct BrowserOptions {
     /// Whether to show the browser window (false = headless).
     pub headed: bool,
+    /// Directory for the persistent browser profile (cookies, local storage).
+    pub profile_dir: PathBuf,
 }
 
+/// Extra Chromium flags that skip work the login/export flow never needs.
+///
+/// The playwright crate does not expose request routing, so resources are
+/// trimmed at launch instead: remote fonts and background networking
+/// (update checks, field trials, crash uploads) are pure overhead here.
+/// Images stay enabled — the export button is an image link and must keep
+/// its rendered size for Playwright's visibility checks.
+const EXTRA_BROWSER_ARGS: &[&str] = &["--disable-remote-fonts", "--disable-background-networking"];
+
 /// Wrapper around Playwright browser instance.
+///
+/// Uses a persistent context backed by an on-disk profile so cookies
+/// survive between runs — a still-valid session lets the scraper skip
+/// the login step entirely.
 pub struct BrowserSession {
     #[allow(dead_code)]
     playwright: Arc<Playwright>,
-    browser: Browser,
+    context: BrowserContext,
 }
 
 /// Find Chromium executable from npx-installed Playwright browsers.
@@ -26,19 +41,14 @@ pub struct BrowserSession {
 fn find_chromium_executable() -> Option<PathBuf> {
     let home = std::env::var("HOME").ok()?;
 
-    // Check macOS Playwright cache location
+    // Only the current platform's cache location can contain a usable
+    // browser, so don't stat the other platform's directory at all.
+    #[cfg(target_os = "macos")]
     let cache_dir = PathBuf::from(&home).join("Library/Caches/ms-playwright");
-    if let Some(path) = find_chromium_in_cache(&cache_dir) {
-        return Some(path);
-    }
+    #[cfg(not(target_os = "macos"))]
+    let cache_dir = PathBuf::from(&home).join(".cache/ms-playwright");
 
-    // Check Linux Playwright cache location
-    let linux_cache_dir = PathBuf::from(&home).join(".cache/ms-playwright");
-    if let Some(path) = find_chromium_in_cache(&linux_cache_dir) {
-        return Some(path);
-    }
-
-    None
+    find_chromium_in_cache(&cache_dir)
 }
 
 /// Search for Chromium in a Playwright cache directory.
@@ -48,29 +58,27 @@ fn find_chromium_in_cache(cache_dir: &PathBuf) -> Option<PathBuf> {
     }
 
     let entries = std::fs::read_dir(cache_dir).ok()?;
-    let mut chromium_dirs: Vec<_> = entries
+    // Single pass: only the latest version matters, so take the max file
+    // name instead of collecting and sorting the whole directory.
+    let chromium_dir = entries
         .filter_map(|e| e.ok())
         .filter(|e| {
             let name = e.file_name();
             let name = name.to_string_lossy();
             name.starts_with("chromium-") && !name.contains("headless_shell")
         })
-        .collect();
-
-    // Sort descending to get latest version first
-    chromium_dirs.sort_by_key(|d| std::cmp::Reverse(d.file_name()));
-
-    let chromium_dir = chromium_dirs.first()?;
+        .max_by_key(|e| e.file_name())?;
 
     // Try platform-specific paths
+    #[cfg(target_os = "macos")]
     let candidates = [
         // macOS ARM64
         "chrome-mac-arm64/Google Chrome for Testing.app/Contents/MacOS/Google Chrome for Testing",
         // macOS Intel
         "chrome-mac/Google Chrome for Testing.app/Contents/MacOS/Google Chrome for Testing",
-        // Linux
-        "chrome-linux/chrome",
     ];
+    #[cfg(not(target_os = "macos"))]
+    let candidates = ["chrome-linux/chrome"];
 
     for candidate in candidates {
         let path = chromium_dir.path().join(candidate);
@@ -95,36 +103,51 @@ impl BrowserSession {
             "Chromium not found. Run 'npm install && npx playwright install chromium' first.",
         )?;
 
-        let browser = playwright
+        let extra_args: Vec<String> = EXTRA_BROWSER_ARGS.iter().map(|s| s.to_string()).collect();
+
+        std::fs::create_dir_all(&options.profile_dir)
+            .context("Failed to create browser profile directory")?;
+
+        // Launch a persistent context instead of browser + ephemeral context:
+        // session cookies land in the profile dir and are reused next run.
+        // Downloads are accepted so we can capture exported files.
+        let context = playwright
             .chromium()
-            .launcher()
+            .persistent_context_launcher(&options.profile_dir)
             .headless(!options.headed)
             .executable(&chromium_path)
+            .args(&extra_args)
+            .accept_downloads(true)
             .launch()
             .await
             .context("Failed to launch Chromium browser")?;
 
+        // One timeout policy for the whole session instead of per-call
+        // values scattered through the scraper: 15 s for element actions,
+        // 30 s for navigations.
+        context
+            .set_default_timeout(15_000)
+            .await
+            .context("Failed to set default timeout")?;
+        context
+            .set_default_navigation_timeout(30_000)
+            .await
+            .context("Failed to set default navigation timeout")?;
+
         Ok(Self {
             playwright,
-            browser,
+            context,
         })
     }
 
-    /// Create a new browser context (isolated session).
-    ///
-    /// Downloads are accepted by default so we can capture exported files.
-    pub async fn new_context(&self) -> Result<BrowserContext> {
-        self.browser
-            .context_builder()
-            .accept_downloads(true)
-            .build()
-            .await
-            .context("Failed to create browser context")
+    /// The persistent browser context backing this session.
+    pub fn context(&self) -> &BrowserContext {
+        &self.context
     }
 
     /// Close the browser.
     pub async fn close(self) -> Result<()> {
-        self.browser
+        self.context
             .close()
             .await
             .context("Failed to close browser")
@@ -2,6 +2,14 @@
 
 use anyhow::{Context, Result};
 
+/// Guidance shown once, attached to the error, when credentials are missing.
+const CREDENTIALS_HELP: &str = "\
+Set CLASSEVIVA_USER and CLASSEVIVA_PASSWORD in the environment or in a .env file:
+
+    CLASSEVIVA_USER=your.username
+    CLASSEVIVA_PASSWORD=your-password
+";
+
 /// Classe Viva credentials loaded from environment.
 #[derive(Debug, Clone)]
 pub struct Credentials {
@@ -15,14 +23,22 @@ impl Credentials {
     /// Expects `CLASSEVIVA_USER` and `CLASSEVIVA_PASSWORD` to be set,
     /// either in the environment or in a `.env` file.
     pub fn from_env() -> Result<Self> {
-        // Load .env file if present (ignore errors if not found)
-        let _ = dotenvy::dotenv();
+        // Load .env file only when something is actually missing from the
+        // environment — dotenv probes the filesystem for the file otherwise.
+        // Ignore errors if the file is not found.
+        if std::env::var_os("CLASSEVIVA_USER").is_none()
+            || std::env::var_os("CLASSEVIVA_PASSWORD").is_none()
+        {
+            let _ = dotenvy::dotenv();
+        }
 
-        let username = std::env::var("CLASSEVIVA_USER")
-            .context("CLASSEVIVA_USER environment variable not set")?;
+        let username = std::env::var("CLASSEVIVA_USER").with_context(|| {
+            format!("CLASSEVIVA_USER environment variable not set\n{CREDENTIALS_HELP}")
+        })?;
 
-        let password = std::env::var("CLASSEVIVA_PASSWORD")
-            .context("CLASSEVIVA_PASSWORD environment variable not set")?;
+        let password = std::env::var("CLASSEVIVA_PASSWORD").with_context(|| {
+            format!("CLASSEVIVA_PASSWORD environment variable not set\n{CREDENTIALS_HELP}")
+        })?;
 
         Ok(Self { username, password })
     }
@@ -115,8 +115,11 @@ async fn fetch_command(
     }
     info!("Output directory: {:?}", output_dir);
 
-    // Launch browser
-    let options = BrowserOptions { headed };
+    // Launch browser with a persistent profile so the login survives runs
+    let options = BrowserOptions {
+        headed,
+        profile_dir: output_dir.join("profile"),
+    };
     info!(
         "Launching browser ({})",
         if headed { "headed" } else { "headless" }
@@ -126,11 +129,8 @@ async fn fetch_command(
         .await
         .context("Failed to launch browser")?;
 
-    // Create browser context
-    let context = session.new_context().await?;
-
     // Create scraper and run
-    let scraper = ClasseVivaScraper::new(context, credentials);
+    let scraper = ClasseVivaScraper::new(session.context(), credentials);
 
     match scraper.fetch(range, &output_dir, dry_run).await {
         Ok(Some(path)) => {
@@ -4,7 +4,7 @@ use anyhow::{anyhow, Context, Result};
 use chrono::NaiveDate;
 use playwright::api::frame::FrameState;
 use playwright::api::page::{Event, EventType};
-use playwright::api::{BrowserContext, Page};
+use playwright::api::{BrowserContext, DocumentLoadState, Page};
 use std::path::{Path, PathBuf};
 use std::time::Duration;
 use tracing::{debug, info};
@@ -21,6 +21,9 @@ mod selectors {
     pub const LOGIN_SUBMIT: &str = "button[type='submit']";
     /// "Continua senza associare l'email" skip link on the post-login nag screen.
     pub const SKIP_EMAIL_LINK: &str = "a:has-text('Continua senza associare')";
+    /// Matches whichever post-login page we land on: the email nag screen
+    /// (skip link) or the agenda itself (export button).
+    pub const POST_LOGIN: &str = "a:has-text('Continua senza associare'), a.export[alt='scarica']";
     /// Export button - an <a> tag with class "export" and alt="scarica"
     pub const EXPORT_BUTTON: &str = "a.export[alt='scarica']";
     pub const EXPORT_DIALOG: &str = "div.ui-dialog[role='dialog']";
@@ -29,6 +32,32 @@ mod selectors {
     pub const CONFIRM_BUTTON: &str = "div.ui-dialog button:has-text('Conferma')";
 }
 
+/// Fills the DD-MM-YYYY date fields page-side: sets each input's value,
+/// fires the input/change events a typed fill would produce, and pushes the
+/// value into the jQuery datepicker (which keeps its own internal state).
+/// Takes an array of [selector, value] pairs so both fields are handled in
+/// one evaluate call.
+const JS_FILL_DATE_FIELDS: &str = r#"
+    (pairs) => {
+        for (const [selector, value] of pairs) {
+            const el = document.querySelector(selector);
+            if (!el) {
+                throw new Error('Date field not found: ' + selector);
+            }
+            el.value = value;
+            el.dispatchEvent(new Event('input', { bubbles: true }));
+            el.dispatchEvent(new Event('change', { bubbles: true }));
+            if (typeof jQuery !== 'undefined' && jQuery(el).datepicker) {
+                const parts = value.split('-');
+                if (parts.length === 3) {
+                    const date = new Date(parts[2], parts[1] - 1, parts[0]);
+                    jQuery(el).datepicker('setDate', date);
+                }
+            }
+        }
+    }
+"#;
+
 /// Date range for export.
 #[derive(Debug, Clone)]
 pub struct DateRange {
@@ -57,14 +86,14 @@ impl DateRange {
 }
 
 /// Scraper for Classe Viva homework export.
-pub struct ClasseVivaScraper {
-    context: BrowserContext,
+pub struct ClasseVivaScraper<'a> {
+    context: &'a BrowserContext,
     credentials: Credentials,
 }
 
-impl ClasseVivaScraper {
+impl<'a> ClasseVivaScraper<'a> {
     /// Create a new scraper with the given browser context and credentials.
-    pub fn new(context: BrowserContext, credentials: Credentials) -> Self {
+    pub fn new(context: &'a BrowserContext, credentials: Credentials) -> Self {
         Self {
             context,
             credentials,
@@ -80,25 +109,32 @@ impl ClasseVivaScraper {
             .await
             .context("Failed to create new page")?;
 
-        // Navigate to agenda - will redirect to login if not authenticated
+        // Navigate to agenda - will redirect to login if not authenticated.
+        // DOMContentLoaded is enough here: the wait below on the login field
+        // is the real readiness signal, so there is no need to sit out the
+        // full load event (images, trackers) first.
         page.goto_builder(AGENDA_URL)
+            .wait_until(DocumentLoadState::DomContentLoaded)
             .goto()
             .await
             .context("Failed to navigate to agenda page")?;
 
-        // Wait for login form to appear
-        debug!("Waiting for login form");
-        page.wait_for_selector_builder(selectors::LOGIN_USERNAME)
-            .wait_for_selector()
-            .await
-            .context("Login form did not appear")?;
+        // With a persistent profile the previous session may still be valid,
+        // in which case the agenda URL does not redirect to the login page
+        // and the whole login flow can be skipped.
+        let url = page.url().context("Failed to read page URL")?;
+        if !url.to_lowercase().contains("login") {
+            info!("Existing session still valid - skipping login");
+            return Ok(page);
+        }
 
-        // Fill credentials
+        // Fill credentials. fill waits for the field itself, so a separate
+        // wait_for_selector round-trip beforehand adds nothing.
         info!("Filling login credentials");
         page.fill_builder(selectors::LOGIN_USERNAME, &self.credentials.username)
             .fill()
             .await
-            .context("Failed to fill username")?;
+            .context("Login form did not appear or username fill failed")?;
 
         page.fill_builder(selectors::LOGIN_PASSWORD, &self.credentials.password)
             .fill()
@@ -112,12 +148,15 @@ impl ClasseVivaScraper {
             .await
             .context("Failed to click login button")?;
 
-        // After submitting, the page navigates. Wait for that navigation to
-        // settle, then check whether the email nag screen appeared.
+        // After submitting, the page navigates. Wait for whichever post-login
+        // page renders first — the email nag screen or the agenda — instead of
+        // sleeping a fixed amount and hoping the redirect has settled.
         info!("Login submitted, waiting for post-login page");
-
-        // Wait for the page to finish loading after the redirect.
-        tokio::time::sleep(Duration::from_secs(2)).await;
+        page.wait_for_selector_builder(selectors::POST_LOGIN)
+            .state(FrameState::Visible)
+            .wait_for_selector()
+            .await
+            .context("Post-login page did not appear")?;
 
         self.dismiss_email_nag(&page).await?;
 
@@ -125,33 +164,32 @@ impl ClasseVivaScraper {
     }
 
     /// After login, Classe Viva sometimes shows an "associate your email" nag
-    /// screen before the agenda. Detect it by looking for the skip link with a
-    /// short timeout — if the selector doesn't appear within 5 s we're already
-    /// on the agenda and can move on.
+    /// screen before the agenda. The caller has already waited for the
+    /// post-login page (nag or agenda) to render, so a single instant
+    /// visibility check tells us which one we got — no extra wait needed.
     async fn dismiss_email_nag(&self, page: &Page) -> Result<()> {
         debug!("Checking for email nag screen");
 
-        // 5 000 ms timeout: enough time for the nag to render if it's coming,
-        // short enough not to add painful delay when it isn't there.
-        let found = page
-            .wait_for_selector_builder(selectors::SKIP_EMAIL_LINK)
-            .timeout(5_000f64)
-            .wait_for_selector()
-            .await;
-
-        match found {
-            Ok(Some(_)) => {
-                info!("Email nag screen detected — clicking skip link");
-                page.click_builder(selectors::SKIP_EMAIL_LINK)
-                    .click()
-                    .await
-                    .context("Failed to click 'Continua senza associare l'email'")?;
-                info!("Email nag dismissed");
-            }
-            // Selector not found within timeout → already on the agenda page.
-            Ok(None) | Err(_) => {
-                debug!("No email nag screen — proceeding to agenda");
+        // Treat only a clean "not visible" as the no-nag case; an actual
+        // protocol error is worth surfacing in the logs instead of being
+        // silently folded into "no nag".
+        let nag_visible = match page.is_visible(selectors::SKIP_EMAIL_LINK, None).await {
+            Ok(visible) => visible,
+            Err(e) => {
+                debug!("Nag visibility check failed ({e}); assuming no nag screen");
+                false
             }
+        };
+
+        if nag_visible {
+            info!("Email nag screen detected — clicking skip link");
+            page.click_builder(selectors::SKIP_EMAIL_LINK)
+                .click()
+                .await
+                .context("Failed to click 'Continua senza associare l'email'")?;
+            info!("Email nag dismissed");
+        } else {
+            debug!("No email nag screen — proceeding to agenda");
         }
 
         Ok(())
@@ -161,25 +199,14 @@ impl ClasseVivaScraper {
     pub async fn open_export_dialog(&self, page: &Page) -> Result<()> {
         info!("Opening export dialog");
 
-        // Wait for the export button to be visible and stable
-        debug!("Waiting for export button to appear");
-        page.wait_for_selector_builder(selectors::EXPORT_BUTTON)
-            .state(FrameState::Visible)
-            .wait_for_selector()
-            .await
-            .context("Export button not found - login may have failed")?;
-
-        // Small delay to ensure the page is fully interactive
-        // This helps with race conditions where the element exists but isn't clickable
-        tokio::time::sleep(Duration::from_millis(500)).await;
-
-        // Click with force option to bypass actionability checks if needed
+        // Playwright's click already waits for the element to be visible,
+        // stable and receiving events, so there is no need for a separate
+        // selector wait, a settling sleep, or a forced click.
         debug!("Clicking export button");
         page.click_builder(selectors::EXPORT_BUTTON)
-            .force(true)
             .click()
             .await
-            .context("Failed to click export button")?;
+            .context("Failed to click export button - login may have failed")?;
 
         // Wait for dialog to appear
         debug!("Waiting for export dialog");
@@ -202,49 +229,18 @@ impl ClasseVivaScraper {
 
         info!("Setting date range: {} to {}", from_str, to_str);
 
-        // Helper to fill a date field, handling jQuery datepicker if present
-        async fn fill_date_field(page: &Page, selector: &str, value: &str) -> Result<()> {
-            // First, try to use Playwright's fill which clears and types
-            page.fill_builder(selector, value)
-                .fill()
-                .await
-                .context("Failed to fill date field")?;
-
-            // Also trigger jQuery datepicker update if it exists
-            // The datepicker stores its value internally and we need to sync it
-            let js_sync_datepicker = r#"
-                ([selector, value]) => {
-                    const el = document.querySelector(selector);
-                    if (el && typeof jQuery !== 'undefined' && jQuery(el).datepicker) {
-                        // Parse DD-MM-YYYY format
-                        const parts = value.split('-');
-                        if (parts.length === 3) {
-                            const date = new Date(parts[2], parts[1] - 1, parts[0]);
-                            jQuery(el).datepicker('setDate', date);
-                        }
-                    }
-                }
-            "#;
-
-            page.evaluate::<_, ()>(js_sync_datepicker, serde_json::json!([selector, value]))
-                .await
-                .context("Failed to sync datepicker")?;
-
-            Ok(())
-        }
-
-        // Set the "from" date
-        debug!("Setting from date: {}", from_str);
-        fill_date_field(page, selectors::DATE_FROM, &from_str).await?;
-
-        tokio::time::sleep(Duration::from_millis(200)).await;
-
-        // Set the "to" date
-        debug!("Setting to date: {}", to_str);
-        fill_date_field(page, selectors::DATE_TO, &to_str).await?;
-
-        // Pause after setting dates to let UI fully update before clicking confirm
-        tokio::time::sleep(Duration::from_millis(500)).await;
+        // Fill both fields, fire their events and sync the datepickers in a
+        // single evaluate instead of two fill round-trips plus a third for
+        // the datepicker sync.
+        page.evaluate::<_, ()>(
+            JS_FILL_DATE_FIELDS,
+            serde_json::json!([
+                [selectors::DATE_FROM, &from_str],
+                [selectors::DATE_TO, &to_str]
+            ]),
+        )
+        .await
+        .context("Failed to fill date fields")?;
 
         Ok(())
     }
@@ -276,52 +272,63 @@ impl ClasseVivaScraper {
         let popup_future = page.expect_event(EventType::Popup);
 
         // Click confirm to trigger whichever download mechanism the site uses.
+        // Bound the actionability wait: if the button is not clickable within
+        // a few seconds something is wrong with the dialog, and the default
+        // 30 s timeout would just delay the failure.
         debug!("Clicking confirm button");
         page.click_builder(selectors::CONFIRM_BUTTON)
+            .timeout(5_000f64)
             .click()
             .await
             .context("Failed to click confirm button")?;
 
-        // Race: direct download on this page vs popup opening.
-        let download = tokio::select! {
-            // Case 1: download fires directly on the main page (newer behaviour).
-            result = direct_download_future => {
-                let event = result.context("Error waiting for direct download event")?;
-                match event {
-                    Event::Download(d) => {
-                        info!("Direct download started: {} ({})", d.suggested_filename(), d.url());
-                        d
+        // Race: direct download on this page vs popup opening. The whole race
+        // is bounded: on the fast path the download starts within a couple of
+        // seconds of the confirm click, so if nothing has fired after 15 s
+        // the attempt is dead and failing fast beats waiting out a long
+        // default timeout — the caller can simply rerun the fetch.
+        let download_race = async {
+            tokio::select! {
+                // Case 1: download fires directly on the main page (newer behaviour).
+                result = direct_download_future => {
+                    let event = result.context("Error waiting for direct download event")?;
+                    match event {
+                        Event::Download(d) => {
+                            info!("Direct download started: {} ({})", d.suggested_filename(), d.url());
+                            Ok(d)
+                        }
+                        _ => Err(anyhow!("Unexpected event, expected Download")),
                     }
-                    _ => return Err(anyhow!("Unexpected event, expected Download")),
                 }
-            }
-            // Case 2: a popup opens first, then the download fires inside it (older behaviour).
-            result = popup_future => {
-                let event = result.context("Error waiting for popup event")?;
-                let popup = match event {
-                    Event::Popup(p) => {
-                        info!("Popup window opened — waiting for download inside it");
-                        p
-                    }
-                    _ => return Err(anyhow!("Unexpected event, expected Popup")),
-                };
-                let dl_event = tokio::time::timeout(
-                    Duration::from_secs(30),
-                    popup.expect_event(EventType::Download),
-                )
-                .await
-                .context("Timeout waiting for download from popup")?
-                .context("Error waiting for download event from popup")?;
-                match dl_event {
-                    Event::Download(d) => {
-                        info!("Popup download started: {} ({})", d.suggested_filename(), d.url());
-                        d
+                // Case 2: a popup opens first, then the download fires inside it (older behaviour).
+                result = popup_future => {
+                    let event = result.context("Error waiting for popup event")?;
+                    let popup = match event {
+                        Event::Popup(p) => {
+                            info!("Popup window opened — waiting for download inside it");
+                            p
+                        }
+                        _ => return Err(anyhow!("Unexpected event, expected Popup")),
+                    };
+                    let dl_event = popup
+                        .expect_event(EventType::Download)
+                        .await
+                        .context("Error waiting for download event from popup")?;
+                    match dl_event {
+                        Event::Download(d) => {
+                            info!("Popup download started: {} ({})", d.suggested_filename(), d.url());
+                            Ok(d)
+                        }
+                        _ => Err(anyhow!("Unexpected event from popup, expected Download")),
                     }
-                    _ => return Err(anyhow!("Unexpected event from popup, expected Download")),
                 }
             }
         };
 
+        let download = tokio::time::timeout(Duration::from_secs(15), download_race)
+            .await
+            .context("Download did not start within 15s of confirming")??;
+
         // Playwright's download interception is unreliable in headed mode —
         // the browser's native download manager takes over and saves to
         // ~/Downloads instead. Instead we grab the URL and cookies from the